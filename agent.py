@@ -1,15 +1,34 @@
 from chatopenai import ChatOpenAI
 import json
 import asyncio
+import time
 
 
 class Agent:
-    def __init__(self, model, mcpClients, sysprompt="", context="") -> None:
+    # model is the large model used for final answers,
+    # fast_model (optional) is a small model used for tool-selection rounds
+    def __init__(
+        self,
+        model,
+        mcpClients,
+        sysprompt="",
+        context="",
+        fast_model=None,
+        llm_timeout=30.0,
+    ) -> None:
+        if fast_model and not llm_timeout:
+            # without a limit the fast tier would use the client's 600 s timeout and retries
+            raise ValueError("llm_timeout is required when fast_model is set")
         self.mcpClients = mcpClients
         self.model = model
+        self.fast_model = fast_model
+        self.llm_timeout = llm_timeout  # seconds before a fast-tier request falls back
         self.sys_prompt = sysprompt
         self.context = context
         self.llm = None
+        # per-tier request latencies in seconds, used to quantify the routing savings.
+        # "escalated" holds fast rounds that were discarded and answered by the large model
+        self.tier_latency = {"fast": [], "large": [], "escalated": []}
 
     async def init(self):
         print("Initializing mcp clients.....")
@@ -50,64 +69,130 @@ class Agent:
         if not self.llm:
             raise Exception("Agent not initialized")
 
-        content, tool_calls = self.llm.chat(prompt=prompt)
+        content, tool_calls = self._route(prompt)
         while True:
             if len(tool_calls) > 0:
-                # process all tool calls
-                for tool_call in tool_calls:
-                    # find the mcp client that handles current tool call
-                    mcp = next(
-                        (
-                            client
-                            for client in self.mcpClients
-                            if any(
-                                t.name == tool_call["function"]["name"]
-                                for t in client.get_tools()
-                            )
-                        ),
-                        None,
-                    )
-
-                    if mcp:
-                        print(f"Calling tool: {tool_call['function']['name']}")
-                        print(f"Arguments: {tool_call['function']['arguments']}")
-                        # call the tool and get the result
-                        result = await mcp.call_tool(
-                            tool_call["function"]["name"],
-                            json.loads(tool_call["function"]["arguments"]),
-                        )
-
-                        # convert the result to a string
-                        result_str = ""
-                        if hasattr(result, "content") and result.content:
-                            # only get the text of the first content
-                            # LLM expects the tool result in a JSON-serialized string matching the tool's expected output schema.
-                            # If the format does not match what the LLM expects, it may not recognize the tool as complete and will
-                            # keep re-calling the tool --> infinite loop
-                            result_dict = {
-                                "content": (
-                                    result.content[0].text if result.content else ""
-                                ),
-                                "isError": getattr(result, "isError", False),
-                            }
-                            # convert the result to a string
-                            result_str = json.dumps(result_dict)
-                        else:
-                            result_str = str(result)
-
-                        print(f"Result: {result_str}")
-                        self.llm.append_tool_result(tool_call["id"], result_str)
-                    else:
-                        self.llm.append_tool_result(tool_call["id"], "Tool not found")
+                # process all tool calls of this round concurrently, so a slow tool
+                # (e.g. fetch_txt on a replicated MCPClientPool) does not block the others
+                results = await asyncio.gather(
+                    *(self._call_tool(tool_call) for tool_call in tool_calls)
+                )
+                # append the results in the order the LLM requested the tool calls
+                for tool_call, result_str in zip(tool_calls, results):
+                    self.llm.append_tool_result(tool_call["id"], result_str)
 
                 # continue the conversation with the updated context with the LLM
-                content, tool_calls = self.llm.chat("")
+                content, tool_calls = self._route("")
                 continue
 
             # no tool calls, end the conversation
             await self.close()
             return content
 
+    # call one tool on the mcp client that provides it and return the result as a string
+    async def _call_tool(self, tool_call) -> str:
+        # find the mcp client that handles current tool call
+        mcp = next(
+            (
+                client
+                for client in self.mcpClients
+                if any(
+                    t.name == tool_call["function"]["name"] for t in client.get_tools()
+                )
+            ),
+            None,
+        )
+        if not mcp:
+            return "Tool not found"
+
+        print(f"Calling tool: {tool_call['function']['name']}")
+        print(f"Arguments: {tool_call['function']['arguments']}")
+        # call the tool and get the result
+        result = await mcp.call_tool(
+            tool_call["function"]["name"],
+            json.loads(tool_call["function"]["arguments"]),
+        )
+
+        # convert the result to a string
+        result_str = ""
+        if hasattr(result, "content") and result.content:
+            # only get the text of the first content
+            # LLM expects the tool result in a JSON-serialized string matching the tool's expected output schema.
+            # If the format does not match what the LLM expects, it may not recognize the tool as complete and will
+            # keep re-calling the tool --> infinite loop
+            result_dict = {
+                "content": (result.content[0].text if result.content else ""),
+                "isError": getattr(result, "isError", False),
+            }
+            # convert the result to a string
+            result_str = json.dumps(result_dict)
+        else:
+            result_str = str(result)
+
+        print(f"Result: {result_str}")
+        return result_str
+
+    # send one round to the LLM, using the fast model for tool selection when configured
+    def _route(self, prompt: str):
+        if not self.fast_model:
+            return self._timed("large", self.llm.chat, prompt, model_name=self.model)
+
+        # the fast round streams silently: its reply is only shown once accepted
+        start = time.perf_counter()
+        try:
+            content, tool_calls = self.llm.chat(
+                prompt,
+                model_name=self.fast_model,
+                timeout=self.llm_timeout,
+                echo=False,
+            )
+        except Exception as e:
+            # the user prompt is already in the history, only the answer is missing
+            self.tier_latency["escalated"].append(time.perf_counter() - start)
+            print(f"Warning: fast model failed ({e}), falling back to {self.model}")
+            return self._timed("large", self.llm.complete, model_name=self.model)
+
+        if tool_calls and all(self._valid_arguments(t) for t in tool_calls):
+            self.tier_latency["fast"].append(time.perf_counter() - start)
+            if content:
+                print(content)
+            return content, tool_calls
+
+        # either the fast model wants to give the final answer or it produced
+        # malformed tool arguments: answer this round again with the large model.
+        # The discarded fast round is recorded as "escalated", not as useful fast work.
+        self.tier_latency["escalated"].append(time.perf_counter() - start)
+        reason = "malformed tool arguments" if tool_calls else "final answer"
+        print(f"Escalating to {self.model} ({reason})")
+        self.llm.discard_last_response()
+        return self._timed("large", self.llm.complete, model_name=self.model)
+
+    def _timed(self, tier: str, request, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return request(*args, **kwargs)
+        finally:
+            self.tier_latency[tier].append(time.perf_counter() - start)
+
+    @staticmethod
+    def _valid_arguments(tool_call) -> bool:
+        try:
+            return isinstance(json.loads(tool_call["function"]["arguments"]), dict)
+        except (json.JSONDecodeError, TypeError, KeyError):
+            return False
+
+    def latency_stats(self):
+        """Return request count, total and mean latency (seconds) per model tier"""
+        stats = {}
+        for tier, samples in self.tier_latency.items():
+            total = sum(samples)
+            stats[tier] = {
+                "requests": len(samples),
+                "total": total,
+                "mean": total / len(samples) if samples else 0.0,
+            }
+        return stats
+
     # convert an MCP tool object to OpenAI function-calling tool schema
     @staticmethod
     def convert_mcp_tool_to_openai_function(tool):
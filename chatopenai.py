@@ -2,6 +2,7 @@ from dotenv import (
     load_dotenv,
 )  # Import function to load environment variables from a .env file
 import os  # Module to access environment variables and OS functions
+import time
 
 # import openai                      # OpenAI client library for interacting with OpenAI APIs
 from openai import OpenAI  # Import the OpenAI client
@@ -49,11 +50,20 @@ class ChatOpenAI:
         # self.messages[0] is the very first message you sent (usually the system prompt),
         # and self.messages[-1] is the most recent message in the conversation.
 
-    def chat(self, prompt: str):
+    def chat(
+        self,
+        prompt: str,
+        model_name: str = None,
+        timeout: float = None,
+        echo: bool = True,
+    ):
         """
         Sends a user prompt to the chat model and streams the response.
         Yields each chunk of the assistant's reply as it arrives.
         Returns the full accumulated content and tool calls at the end.
+
+        model_name overrides self.model_name for this request only,
+        timeout and echo are passed to complete().
         """
 
         # Add system prompt at the beginning of the conversation if provided
@@ -67,14 +77,37 @@ class ChatOpenAI:
         # Append the current user prompt to the message history
         self.messages.append({"role": "user", "content": prompt})
 
+        return self.complete(model_name=model_name, timeout=timeout, echo=echo)
+
+    def complete(
+        self, model_name: str = None, timeout: float = None, echo: bool = True
+    ):
+        """
+        Streams a response for the current message history without adding a new user message.
+        The assistant message is only appended once the stream finished, so a failed
+        request can be retried (e.g. with another model) on the same history.
+
+        timeout (seconds) limits the whole request including the stream: the request is
+        sent without retries and TimeoutError is raised once the limit is exceeded.
+        echo=False streams silently instead of printing the reply as it arrives.
+        """
+        request = {
+            "model": model_name or self.model_name,
+            "messages": self.messages,
+            "temperature": self.temperature,
+            "tools": self.tools,
+            "stream": True,
+        }
+        client = self.client
+        deadline = None
+        if timeout is not None:
+            # a retried request could take several times the timeout, and the
+            # client's timeout only applies per read, not to the whole stream
+            client = self.client.with_options(max_retries=0, timeout=timeout)
+            deadline = time.monotonic() + timeout
+
         # Create a streaming chat completion request
-        stream = self.client.chat.completions.create(
-            model=self.model_name,
-            messages=self.messages,
-            temperature=self.temperature,
-            tools=self.tools,
-            stream=True,
-        )
+        stream = client.chat.completions.create(**request)
 
         accumulated_content = ""
         # tool_calls are typically a list directly from the delta
@@ -89,18 +122,24 @@ class ChatOpenAI:
         # When streaming, the API delivers chunks sequentially
         # and in each chunk choices[0] always contains the newest portion of the generated response.
         for chunk in stream:
+            if deadline is not None and time.monotonic() > deadline:
+                stream.close()
+                raise TimeoutError(f"Request exceeded {timeout}s")
+
             delta = chunk.choices[0].delta
             finish_reason = chunk.choices[0].finish_reason
 
             # 1. If the model signals it's done, exit the loop
             if finish_reason:
-                print(f"\nStream finished. Reason: {finish_reason}")  # For debugging
+                if echo:
+                    print(f"\nStream finished. Reason: {finish_reason}")  # For debugging
                 break
 
             # 2. Handle plain-text increments
             if delta.content:
                 text = delta.content
-                print(text, end="", flush=True)
+                if echo:
+                    print(text, end="", flush=True)
                 accumulated_content += text
 
             # 3. Handle function/tool calls sent incrementally
@@ -138,7 +177,8 @@ class ChatOpenAI:
             for index in sorted(building_tool_calls.keys()):
                 finalized_call = building_tool_calls[index]
                 current_tool_calls_list.append(finalized_call)
-                print(f"\nTool Call (Index {index}): {finalized_call}")
+                if echo:
+                    print(f"\nTool Call (Index {index}): {finalized_call}")
 
         # Append the model response to assistant's message
         assistant_message = {
@@ -154,6 +194,11 @@ class ChatOpenAI:
 
         return accumulated_content, current_tool_calls_list
 
+    def discard_last_response(self):
+        """Remove the last assistant message so the round can be answered again"""
+        if self.messages and self.messages[-1]["role"] == "assistant":
+            self.messages.pop()
+
     def append_tool_result(self, tool_call_id: str, result: str):
         """Append a tool call result to the conversation history"""
         self.messages.append(
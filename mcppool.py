@@ -0,0 +1,352 @@
+# A single MCPClient owns exactly one server subprocess and one ClientSession,
+# so every tool call for that server is serialized through one stdio pipe.
+# MCPClientPool launches N identical replicas of the same command/args and
+# routes each tool call to one of them, so a slow call (e.g. fetch_txt) does not
+# block every other call behind it.
+#
+# The pool exposes the same interface as MCPClient (connect_to_server, get_tools,
+# call_tool, disconnect_from_server), so it can be passed to Agent unchanged.
+# Replicas only help when several calls are in flight at once, i.e. when the
+# caller issues tool calls concurrently (e.g. with asyncio.gather).
+import asyncio
+import itertools
+import time
+from typing import Optional
+
+from mcp.shared.exceptions import McpError
+
+from mcpclient import MCPClient
+
+# mcp.types.CONNECTION_CLOSED: error code of the McpError raised when the server goes away
+CONNECTION_CLOSED = -32000
+
+
+class _Replica:
+    """One server subprocess plus the number of calls currently in flight on it."""
+
+    def __init__(self, client: MCPClient) -> None:
+        self.client = client
+        self.in_flight = 0
+        self.last_used = time.monotonic()
+        self.error: Optional[BaseException] = None
+        self.ready = asyncio.Event()
+        self.stop = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    async def run(self):
+        # stdio_client opens an anyio task group, which must be entered and exited
+        # in the same task. This runner task owns the transport for the replica's
+        # whole lifetime: it connects, waits until asked to stop, then disconnects.
+        try:
+            try:
+                await self.client.connect_to_server()
+            except Exception as e:
+                self.error = e
+            else:
+                self.ready.set()
+                await self.stop.wait()
+        finally:
+            # also closes the half-entered exit stack of a failed or cancelled connect
+            try:
+                await self.client.disconnect_from_server()
+            except Exception as e:
+                print(f"Warning: Error closing replica {self.client.name}: {e}")
+            self.ready.set()
+
+    async def shutdown(self):
+        """Ask the runner task to disconnect and wait until it is done."""
+        self.stop.set()
+        if not self.ready.is_set():
+            # still connecting: interrupt the connect, the runner cleans up in its finally
+            self.task.cancel()
+        try:
+            # shield: cancelling the waiter must not interrupt the disconnect
+            await asyncio.shield(self.task)
+        except asyncio.CancelledError:
+            if not self.task.done():
+                raise
+
+
+class MCPClientPool:
+    """
+    A replica group of identical MCP servers with least-loaded or round-robin routing.
+
+    Scaling runs in a background controller task, never in the call path:
+    it adds a replica when the average number of in-flight calls per replica
+    reaches scale_up_queue_depth or when fewer than min_replicas are healthy,
+    and stops a replica once it has been idle for idle_timeout seconds.
+    A replica whose transport fails is dropped and replaced.
+
+    Args:
+        name (str): name of the pool, replicas are named "<name>-<n>"
+        command (str): command used to launch every replica
+        args (list[str]): arguments passed to the command
+        min_replicas (int): replicas started on connect and kept alive
+        max_replicas (int): upper bound for autoscaling
+        strategy (str): "least_loaded" or "round_robin"
+        sticky_tools (list[str]): stateful tools whose calls always go to the same replica
+        scale_up_queue_depth (int): average in-flight calls per replica that triggers a new replica
+        idle_timeout (float): seconds a replica must sit idle before it is stopped
+        scale_interval (float): seconds between two checks of the controller
+        start_timeout (float): seconds a replica may take to start before it is given up
+    """
+
+    STRATEGIES = ("least_loaded", "round_robin")
+
+    def __init__(
+        self,
+        name: str,
+        command: str,
+        args: list[str] = [],
+        version: str = "0.0.1",
+        min_replicas: int = 1,
+        max_replicas: int = 4,
+        strategy: str = "least_loaded",
+        sticky_tools: list[str] = [],
+        scale_up_queue_depth: int = 2,
+        idle_timeout: float = 30.0,
+        scale_interval: float = 1.0,
+        start_timeout: float = 30.0,
+    ) -> None:
+        if min_replicas < 1 or max_replicas < min_replicas:
+            raise ValueError(
+                f"Invalid replica bounds: min={min_replicas}, max={max_replicas}"
+            )
+        if strategy not in self.STRATEGIES:
+            raise ValueError(
+                f"Unknown routing strategy: {strategy}, expected one of {self.STRATEGIES}"
+            )
+
+        self.name = name
+        self.command = command
+        self.args = args
+        self.version = version
+        self.min_replicas = min_replicas
+        self.max_replicas = max_replicas
+        self.strategy = strategy
+        self.sticky_tools = set(sticky_tools)
+        self.scale_up_queue_depth = scale_up_queue_depth
+        self.idle_timeout = idle_timeout
+        self.scale_interval = scale_interval
+        self.start_timeout = start_timeout
+
+        # healthy replicas that calls are routed to
+        self.replicas: list[_Replica] = []
+        # retired replicas whose runner task has not finished disconnecting yet
+        self._stopping: set[_Replica] = set()
+        self.tools = []
+        # sticky tool name -> replica that owns the tool's state
+        self._tool_bindings: dict[str, _Replica] = {}
+        # session key -> replica, held until release_session() is called
+        self._session_bindings: dict[str, _Replica] = {}
+        self._round_robin = itertools.count()
+        self._replica_ids = itertools.count()
+        self._controller: Optional[asyncio.Task] = None
+        # set by call_tool so the controller reacts to a burst without waiting a full interval
+        self._wake = asyncio.Event()
+
+    async def _start_replica(self) -> Optional[_Replica]:
+        client = MCPClient(
+            name=f"{self.name}-{next(self._replica_ids)}",
+            command=self.command,
+            args=self.args,
+            version=self.version,
+        )
+        replica = _Replica(client)
+        replica.task = asyncio.create_task(replica.run())
+        try:
+            await asyncio.wait_for(replica.ready.wait(), self.start_timeout)
+        except asyncio.TimeoutError:
+            replica.error = TimeoutError(f"not ready after {self.start_timeout}s")
+        except asyncio.CancelledError:
+            # pool is shutting down while the replica starts: do not leak it
+            await replica.shutdown()
+            raise
+        if replica.error is not None:
+            await replica.shutdown()
+            print(
+                f"Warning: Pool {self.name}: failed to start replica {client.name}: "
+                f"{replica.error}"
+            )
+            return None
+
+        self.replicas.append(replica)
+        replica.task.add_done_callback(lambda _: self._on_runner_exit(replica))
+        # all replicas run the same server, so the first one defines the tool list
+        if not self.tools:
+            self.tools = client.get_tools()
+        print(
+            f"Pool {self.name}: started replica {client.name} "
+            f"({len(self.replicas)} running)"
+        )
+        return replica
+
+    def _retire(self, replica: _Replica):
+        """Stop routing to a replica and drop its bindings; the runner is stopped separately."""
+        if replica not in self.replicas:
+            return
+        self.replicas.remove(replica)
+        self._stopping.add(replica)
+        for bindings in (self._tool_bindings, self._session_bindings):
+            for key in [k for k, r in bindings.items() if r is replica]:
+                del bindings[key]
+
+    async def _stop_replica(self, replica: _Replica):
+        self._retire(replica)
+        # the runner task disconnects in the task that connected
+        await replica.shutdown()
+        print(
+            f"Pool {self.name}: stopped replica {replica.client.name} "
+            f"({len(self.replicas)} running)"
+        )
+
+    def _mark_unhealthy(self, replica: _Replica, reason):
+        if replica not in self.replicas:
+            return
+        print(
+            f"Warning: Pool {self.name}: replica {replica.client.name} "
+            f"is unhealthy ({reason}), replacing it"
+        )
+        self._retire(replica)
+        replica.stop.set()
+        self._wake.set()
+
+    def _on_runner_exit(self, replica: _Replica):
+        # the runner only exits on its own when the transport failed
+        self._mark_unhealthy(replica, "transport closed")
+        self._stopping.discard(replica)
+
+    async def connect_to_server(self):
+        """
+        Start min_replicas server processes, load the tool list and start the autoscaler.
+        """
+        for _ in range(self.min_replicas - len(self.replicas)):
+            await self._start_replica()
+        if not self.replicas:
+            raise Exception(f"Pool {self.name}: no replica could be started")
+
+        if self._controller is None:
+            self._controller = asyncio.create_task(self._autoscale())
+
+    def get_tools(self):
+        return self.tools
+
+    def queue_depth(self) -> float:
+        """Average number of in-flight calls per replica."""
+        if not self.replicas:
+            return 0.0
+        return sum(r.in_flight for r in self.replicas) / len(self.replicas)
+
+    async def _autoscale(self):
+        # background controller: callers never wait for a replica to start or stop
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.scale_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            if len(self.replicas) < self.min_replicas or (
+                self.queue_depth() >= self.scale_up_queue_depth
+                and len(self.replicas) < self.max_replicas
+            ):
+                # on failure the existing replicas keep serving calls
+                await self._start_replica()
+                continue
+
+            # stop at most one replica per check, and only one that has been idle
+            # for idle_timeout and holds no sticky state
+            now = time.monotonic()
+            pinned = set(map(id, self._tool_bindings.values()))
+            pinned |= set(map(id, self._session_bindings.values()))
+            if len(self.replicas) > self.min_replicas:
+                for replica in self.replicas:
+                    if (
+                        replica.in_flight == 0
+                        and id(replica) not in pinned
+                        and now - replica.last_used >= self.idle_timeout
+                    ):
+                        await self._stop_replica(replica)
+                        break
+
+    def _pick(self, tool_name: str, session_key: Optional[str]) -> _Replica:
+        if not self.replicas:
+            raise Exception(f"Pool {self.name} has no healthy replica")
+
+        if session_key is not None:
+            bindings, key = self._session_bindings, session_key
+        elif tool_name in self.sticky_tools:
+            bindings, key = self._tool_bindings, tool_name
+        else:
+            bindings, key = None, None
+
+        if bindings is not None and key in bindings:
+            return bindings[key]
+
+        if self.strategy == "round_robin":
+            replica = self.replicas[next(self._round_robin) % len(self.replicas)]
+        else:
+            replica = min(self.replicas, key=lambda r: r.in_flight)
+
+        if bindings is not None:
+            bindings[key] = replica
+        return replica
+
+    def release_session(self, session_key: str):
+        """Drop the replica binding of a session key so the replica can be scaled down."""
+        self._session_bindings.pop(session_key, None)
+
+    async def call_tool(
+        self, tool_name: str, tool_params: dict, session_key: Optional[str] = None
+    ):
+        """Call a tool on one of the replicas.
+
+        Args:
+            tool_name (str): The name of the tool to call
+            tool_params (dict): The arguments to pass to the tool
+            session_key (str): Optional key; calls sharing a key hit the same replica
+                until release_session(session_key) is called
+        """
+        replica = self._pick(tool_name, session_key)
+        replica.in_flight += 1
+        if self.queue_depth() >= self.scale_up_queue_depth:
+            self._wake.set()
+        try:
+            return await replica.client.call_tool(tool_name, tool_params)
+        except Exception as e:
+            # an McpError is a tool or protocol error from a live server,
+            # anything else means the transport to the replica is broken
+            if not isinstance(e, McpError) or (
+                getattr(e.error, "code", None) == CONNECTION_CLOSED
+            ):
+                self._mark_unhealthy(replica, e)
+            raise
+        finally:
+            replica.in_flight -= 1
+            replica.last_used = time.monotonic()
+
+    async def disconnect_from_server(self):
+        """
+        Stop the autoscaler and every replica. Safe to call even if never connected.
+        """
+        if self._controller is not None:
+            self._controller.cancel()
+            try:
+                await self._controller
+            except asyncio.CancelledError:
+                pass
+            self._controller = None
+
+        for replica in list(self.replicas):
+            try:
+                await self._stop_replica(replica)
+            except Exception as e:
+                print(f"Warning: Error stopping replica {replica.client.name}: {e}")
+
+        # replicas retired by scale-down or health checks that are still disconnecting
+        for replica in list(self._stopping):
+            try:
+                await replica.shutdown()
+            except Exception as e:
+                print(f"Warning: Error stopping replica {replica.client.name}: {e}")
+            self._stopping.discard(replica)
@@ -0,0 +1,134 @@
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("dotenv")
+
+from agent import Agent
+
+
+class FakeLLM:
+    """Stand-in for ChatOpenAI that replays scripted replies and keeps the message history."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.messages = []
+        self.requests = []
+
+    def _reply(self, method, model_name, timeout, echo):
+        self.requests.append((method, model_name, timeout, echo))
+        reply = self.replies.pop(0)
+        if isinstance(reply, BaseException):
+            raise reply
+        content, tool_calls = reply
+        message = {"role": "assistant", "content": content or None}
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+        self.messages.append(message)
+        return content, tool_calls
+
+    def chat(self, prompt, model_name=None, timeout=None, echo=True):
+        self.messages.append({"role": "user", "content": prompt})
+        return self._reply("chat", model_name, timeout, echo)
+
+    def complete(self, model_name=None, timeout=None, echo=True):
+        return self._reply("complete", model_name, timeout, echo)
+
+    def discard_last_response(self):
+        if self.messages and self.messages[-1]["role"] == "assistant":
+            self.messages.pop()
+
+
+def tool_call(arguments):
+    return {
+        "id": "call_1",
+        "type": "function",
+        "function": {"name": "fetch_txt", "arguments": arguments},
+    }
+
+
+def make_agent(replies):
+    agent = Agent("large", [], fast_model="small", llm_timeout=5)
+    agent.llm = FakeLLM(replies)
+    return agent
+
+
+def counts(agent):
+    return {tier: len(samples) for tier, samples in agent.tier_latency.items()}
+
+
+def test_valid_fast_tool_round_is_accepted():
+    calls = [tool_call('{"url": "https://example.com"}')]
+    agent = make_agent([("", calls)])
+
+    assert agent._route("fetch it") == ("", calls)
+    assert agent.llm.requests == [("chat", "small", 5, False)]
+    assert [m["role"] for m in agent.llm.messages] == ["user", "assistant"]
+    assert agent.llm.messages[-1]["tool_calls"] == calls
+    assert counts(agent) == {"fast": 1, "large": 0, "escalated": 0}
+
+
+@pytest.mark.parametrize(
+    "fast_reply",
+    [
+        ("", [tool_call('{"url": ')]),  # malformed tool arguments
+        ("", [tool_call('["not", "an", "object"]')]),
+        ("small answer", []),  # the fast model wants to give the final answer
+    ],
+)
+def test_fast_round_escalates_to_large_model(fast_reply):
+    agent = make_agent([fast_reply, ("large answer", [])])
+
+    assert agent._route("fetch it") == ("large answer", [])
+    assert [r[:2] for r in agent.llm.requests] == [
+        ("chat", "small"),
+        ("complete", "large"),
+    ]
+    # the discarded fast reply is no longer in the history
+    assert agent.llm.messages == [
+        {"role": "user", "content": "fetch it"},
+        {"role": "assistant", "content": "large answer"},
+    ]
+    assert counts(agent) == {"fast": 0, "large": 1, "escalated": 1}
+
+
+@pytest.mark.parametrize("error", [TimeoutError("too slow"), RuntimeError("500")])
+def test_fast_failure_falls_back_on_same_history(error):
+    agent = make_agent([error, ("large answer", [])])
+
+    assert agent._route("fetch it") == ("large answer", [])
+    assert [r[:2] for r in agent.llm.requests] == [
+        ("chat", "small"),
+        ("complete", "large"),
+    ]
+    # the user prompt was added once and is answered by the large model
+    assert agent.llm.messages == [
+        {"role": "user", "content": "fetch it"},
+        {"role": "assistant", "content": "large answer"},
+    ]
+    assert counts(agent) == {"fast": 0, "large": 1, "escalated": 1}
+
+
+def test_without_fast_model_only_large_model_is_used():
+    agent = Agent("large", [])
+    agent.llm = FakeLLM([("answer", [])])
+
+    assert agent._route("hi") == ("answer", [])
+    assert agent.llm.requests == [("chat", "large", None, True)]
+    assert counts(agent) == {"fast": 0, "large": 1, "escalated": 0}
+
+
+def test_fast_model_requires_timeout():
+    with pytest.raises(ValueError):
+        Agent("large", [], fast_model="small", llm_timeout=None)
+
+
+def test_latency_stats():
+    agent = Agent("large", [])
+    agent.tier_latency = {"fast": [0.1, 0.3], "large": [], "escalated": [0.5]}
+
+    stats = agent.latency_stats()
+    assert stats["fast"]["requests"] == 2
+    assert stats["fast"]["total"] == pytest.approx(0.4)
+    assert stats["fast"]["mean"] == pytest.approx(0.2)
+    assert stats["large"] == {"requests": 0, "total": 0, "mean": 0.0}
+    assert stats["escalated"]["mean"] == pytest.approx(0.5)
@@ -0,0 +1,211 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("mcp")
+
+import mcppool
+from mcppool import MCPClientPool
+
+
+class FakeClient:
+    """Stand-in for MCPClient that records which task owns its transport."""
+
+    live = set()
+    wrong_task = []
+    fail = set()  # replica names whose connect raises
+    hang = set()  # replica names whose connect never finishes
+    disconnect_delay = 0.0
+
+    def __init__(self, name, command, args, version):
+        self.name = name
+        self.task = None
+        self.dead = False
+
+    async def connect_to_server(self):
+        self.task = asyncio.current_task()
+        FakeClient.live.add(self.name)
+        if self.name in FakeClient.hang:
+            await asyncio.Event().wait()
+        await asyncio.sleep(0.01)
+        if self.name in FakeClient.fail:
+            raise RuntimeError("boom")
+
+    def get_tools(self):
+        return ["tool"]
+
+    async def call_tool(self, tool_name, tool_params):
+        if self.dead:
+            raise ConnectionError("server process exited")
+        await asyncio.sleep(tool_params.get("delay", 0))
+        return self.name
+
+    async def disconnect_from_server(self):
+        if self.task is not None and asyncio.current_task() is not self.task:
+            FakeClient.wrong_task.append(self.name)
+        await asyncio.sleep(FakeClient.disconnect_delay)
+        FakeClient.live.discard(self.name)
+
+
+@pytest.fixture(autouse=True)
+def fake_client(monkeypatch):
+    monkeypatch.setattr(mcppool, "MCPClient", FakeClient)
+    FakeClient.live = set()
+    FakeClient.wrong_task = []
+    FakeClient.fail = set()
+    FakeClient.hang = set()
+    FakeClient.disconnect_delay = 0.0
+    yield
+    # every transport must be closed, and closed by the task that opened it
+    assert FakeClient.live == set()
+    assert FakeClient.wrong_task == []
+
+
+def run(coro):
+    # a leaked or hanging runner task must fail the test instead of blocking the suite
+    return asyncio.run(asyncio.wait_for(coro, 5))
+
+
+def make_pool(**kwargs):
+    options = dict(idle_timeout=0.2, scale_interval=0.02, start_timeout=0.2)
+    options.update(kwargs)
+    return MCPClientPool("p", "fake", **options)
+
+
+def test_round_robin_cycles_replicas():
+    async def main():
+        pool = make_pool(min_replicas=3, max_replicas=3, strategy="round_robin")
+        await pool.connect_to_server()
+        names = [await pool.call_tool("tool", {}) for _ in range(6)]
+        await pool.disconnect_from_server()
+        return names
+
+    assert run(main()) == ["p-0", "p-1", "p-2"] * 2
+
+
+def test_least_loaded_picks_idle_replica():
+    async def main():
+        pool = make_pool(min_replicas=3, max_replicas=3)
+        await pool.connect_to_server()
+        pool.replicas[0].in_flight = 2
+        pool.replicas[1].in_flight = 1
+        picked = pool._pick("tool", None).client.name
+        for replica in pool.replicas:
+            replica.in_flight = 0
+        await pool.disconnect_from_server()
+        return picked
+
+    assert run(main()) == "p-2"
+
+
+def test_sticky_tool_and_session_bindings_are_separate():
+    async def main():
+        pool = make_pool(min_replicas=2, max_replicas=2, sticky_tools=["tool"])
+        await pool.connect_to_server()
+        sticky = pool._pick("tool", None)
+        sticky.in_flight = 1
+        # a session key equal to the sticky tool name must not reuse its binding
+        session = pool._pick("other", "tool")
+        sticky.in_flight = 0
+        repeated = [pool._pick("tool", None) for _ in range(3)]
+        repeated_session = pool._pick("other", "tool")
+        await pool.disconnect_from_server()
+        return sticky, session, repeated, repeated_session
+
+    sticky, session, repeated, repeated_session = run(main())
+    assert sticky is not session
+    assert all(r is sticky for r in repeated)
+    assert repeated_session is session
+
+
+def test_release_session_drops_binding():
+    async def main():
+        pool = make_pool(min_replicas=2, max_replicas=2)
+        await pool.connect_to_server()
+        pool._pick("tool", "s1")
+        assert "s1" in pool._session_bindings
+        pool.release_session("s1")
+        pool.release_session("unknown")
+        released = "s1" not in pool._session_bindings
+        await pool.disconnect_from_server()
+        return released
+
+    assert run(main())
+
+
+def test_scales_up_under_load_and_down_when_idle():
+    async def main():
+        pool = make_pool(min_replicas=1, max_replicas=3, scale_up_queue_depth=2)
+        await pool.connect_to_server()
+        for _ in range(3):
+            await asyncio.gather(
+                *(pool.call_tool("tool", {"delay": 0.1}) for _ in range(8))
+            )
+        peak = len(pool.replicas)
+        await asyncio.sleep(0.6)
+        idle = len(pool.replicas)
+        await pool.disconnect_from_server()
+        return peak, idle
+
+    peak, idle = run(main())
+    assert peak == 3
+    assert idle == 1
+
+
+def test_shutdown_during_scale_down_stops_every_replica():
+    async def main():
+        pool = make_pool(min_replicas=1, max_replicas=3, idle_timeout=0.05)
+        await pool.connect_to_server()
+        await pool._start_replica()
+        await pool._start_replica()
+        FakeClient.disconnect_delay = 0.2
+        # let the controller start stopping an idle replica, then shut down
+        while not pool._stopping:
+            await asyncio.sleep(0.01)
+        await pool.disconnect_from_server()
+        return len(pool.replicas), len(pool._stopping)
+
+    assert run(main()) == (0, 0)
+
+
+def test_failed_start_is_replaced_up_to_min_replicas():
+    FakeClient.fail = {"p-1"}
+    FakeClient.hang = {"p-2"}
+
+    async def main():
+        pool = make_pool(min_replicas=2, max_replicas=2, start_timeout=0.05)
+        await pool.connect_to_server()
+        started = len(pool.replicas)
+        # the call still succeeds on the healthy replica
+        result = await pool.call_tool("tool", {})
+        await asyncio.sleep(0.3)
+        recovered = sorted(r.client.name for r in pool.replicas)
+        await pool.disconnect_from_server()
+        return started, result, recovered
+
+    started, result, recovered = run(main())
+    assert started == 1
+    assert result == "p-0"
+    assert recovered == ["p-0", "p-3"]
+
+
+def test_unhealthy_replica_is_dropped_and_replaced():
+    async def main():
+        pool = make_pool(min_replicas=2, max_replicas=2, sticky_tools=["tool"])
+        await pool.connect_to_server()
+        dead = pool._pick("tool", None)
+        pool._pick("other", "s1")
+        dead.client.dead = True
+        with pytest.raises(ConnectionError):
+            await pool.call_tool("tool", {})
+        dropped = dead not in pool.replicas and "tool" not in pool._tool_bindings
+        await asyncio.sleep(0.2)
+        names = sorted(r.client.name for r in pool.replicas)
+        after = await pool.call_tool("tool", {})
+        await pool.disconnect_from_server()
+        return dropped, names, after, dead.client.name
+
+    dropped, names, after, dead_name = run(main())
+    assert dropped
+    assert len(names) == 2 and dead_name not in names
+    assert after != dead_name